@@ -0,0 +1,205 @@
+import numpy as np
+from core.vectorized import (
+    AGENT_TYPE_LIST, VectorMarket, initialize_arrays, receive_basic_income,
+    redistribute_wealth, process_education, human_capital, calculate_inflation,
+    calculate_gini, make_economic_decisions, process_decisions
+)
+from models.education import EducationSystem
+from config.settings import SIMULATION_CONFIG
+
+
+class BatchDPPNSimulator:
+    """
+    Пакетная симуляция множества сценариев в одном процессе.
+    Состояние хранится массивами [сценарий x гражданин], параметры политики -
+    векторами по сценариям, а run_day продвигает все сценарии одновременно.
+    """
+
+    def __init__(self, configs, seed=None, record_balances=False):
+        # Каждый сценарий - переопределения поверх SIMULATION_CONFIG
+        self.configs = [{**SIMULATION_CONFIG, **config} for config in configs]
+        if not self.configs:
+            raise ValueError("At least one scenario config is required")
+
+        population_sizes = {config["population_size"] for config in self.configs}
+        if len(population_sizes) != 1:
+            raise ValueError("All scenarios must share the same population_size")
+        if len({config["simulation_days"] for config in self.configs}) != 1:
+            raise ValueError("All scenarios must share the same simulation_days")
+
+        self.scenarios = len(self.configs)
+        self.population_size = population_sizes.pop()
+        self.rng = np.random.default_rng(seed)
+        self.record_balances = record_balances
+        self.day = 0
+
+        # Векторы параметров политики (форма [сценарии, 1] для broadcast по гражданам)
+        self.basic_income_amount = self._config_vector("basic_income_amount")
+        self.tax_rate = self._config_vector("tax_rate")
+
+        self.state = {}
+        self.courses = EducationSystem().courses
+        self.market = VectorMarket(self.scenarios)
+        self.circulating_pp = np.zeros(self.scenarios)
+        self.tax_revenue = np.zeros(self.scenarios)
+        self.metrics = {
+            "daily_pp_balances": [],
+            "gini_coefficients": [],
+            "inflation_rates": [],
+            "average_happiness": [],
+            "education_levels": [],
+            "market_data": []
+        }
+
+    def _config_vector(self, key):
+        return np.array([config[key] for config in self.configs], dtype=float)[:, None]
+
+    def initialize_population(self):
+        """Инициализация населения во всех сценариях"""
+        self.state = initialize_arrays(self.rng, (self.scenarios, self.population_size))
+
+    def enroll_students(self, mask, course_type):
+        """Запись граждан (маска [сценарии x граждане]) на курс, аналог EducationSystem.enroll_student"""
+        if course_type not in self.courses:
+            return np.zeros_like(mask)
+        cost = self.courses[course_type]["cost"]
+        enrolled = mask & (self.state["pp_balance"] >= cost)
+        self.state["pp_balance"][enrolled] -= cost
+        self.state["course_days"][enrolled] = 30
+        self.state["course_gain"][enrolled] = self.courses[course_type]["skill_gain"]
+        return enrolled
+
+    def run_day(self):
+        """Запуск одного дня симуляции во всех сценариях"""
+        s = self.state
+        balance, happiness, education = s["pp_balance"], s["happiness"], s["education_level"]
+
+        # Базовый доход для всех
+        receive_basic_income(balance, happiness, self.basic_income_amount)
+
+        # Налоги и перераспределение
+        self.tax_revenue = redistribute_wealth(balance, happiness, self.basic_income_amount, self.tax_rate)
+
+        # Образовательный процесс
+        process_education(education, happiness, s["course_days"], s["course_gain"])
+
+        # Обновление рыночных условий
+        inflation_rate = self._calculate_inflation()
+        self.market.update_market_conditions(balance.mean(axis=-1), inflation_rate)
+
+        # Экономические решения граждан
+        decisions = make_economic_decisions(
+            balance, education, s["learning_ability"], s["risk_tolerance"], self.rng
+        )
+        process_decisions(self.market, balance, happiness, education, decisions, self.rng)
+
+        # Расчет метрик
+        self.calculate_metrics()
+        self.day += 1
+
+    def _calculate_inflation(self):
+        s = self.state
+        total_balance = s["pp_balance"].sum(axis=-1)
+        inflation_rate = calculate_inflation(
+            total_balance, human_capital(s["education_level"], s["health"]),
+            self.population_size, self.circulating_pp
+        )
+        self.circulating_pp = total_balance
+        return inflation_rate
+
+    def calculate_metrics(self):
+        """Расчет метрик по сценариям через редукции массивов"""
+        s = self.state
+        if self.record_balances:
+            self.metrics["daily_pp_balances"].append(s["pp_balance"].copy())
+        self.metrics["gini_coefficients"].append(calculate_gini(s["pp_balance"]))
+        self.metrics["inflation_rates"].append(self._calculate_inflation())
+        self.metrics["average_happiness"].append(s["happiness"].mean(axis=-1))
+        self.metrics["education_levels"].append(s["education_level"].mean(axis=-1))
+        self.metrics["market_data"].append(self.market.get_market_statistics())
+
+    def run_simulation(self, days=None):
+        """Запуск полной симуляции для всех сценариев"""
+        days = days or self.configs[0]["simulation_days"]
+
+        print(f"Starting batched DPPN simulation for {days} days...")
+        print(f"Scenarios: {self.scenarios}, population: {self.population_size} citizens each")
+
+        for day in range(days):
+            self.run_day()
+
+            if day % 30 == 0:  # Отчет каждый месяц
+                self.print_progress(day)
+
+        self.print_final_report()
+
+    def print_progress(self, day):
+        """Печать прогресса (разброс метрик по сценариям)"""
+        avg_balance = self.state["pp_balance"].mean(axis=-1)
+        gini = self.metrics["gini_coefficients"][-1]
+        price_index = self.metrics["market_data"][-1]["price_index"]
+
+        print(f"Day {day}: Avg PP={avg_balance.min():.1f}..{avg_balance.max():.1f}, "
+              f"Gini={gini.min():.3f}..{gini.max():.3f}, "
+              f"Price Index={price_index.min():.1f}..{price_index.max():.1f}")
+
+    def print_final_report(self):
+        """Финальный отчет по каждому сценарию"""
+        print("\n" + "="*50)
+        print("DPPN BATCH SIMULATION FINAL REPORT")
+        print("="*50)
+
+        avg_balance = self.state["pp_balance"].mean(axis=-1)
+        poverty_rate = self.calculate_poverty_rate()
+        final_market = self.metrics["market_data"][-1] if self.metrics["market_data"] else None
+
+        for i in range(self.scenarios):
+            line = (f"Scenario {i}: income={self.basic_income_amount[i, 0]:g}, "
+                    f"tax={self.tax_rate[i, 0]:g} | Avg PP={avg_balance[i]:.2f}")
+            if self.metrics["gini_coefficients"]:
+                line += (f", Gini={self.metrics['gini_coefficients'][-1][i]:.3f}"
+                         f", Happiness={self.metrics['average_happiness'][-1][i]:.2f}")
+            if final_market:
+                line += f", Price Index={final_market['price_index'][i]:.1f}"
+            print(line + f", Poverty={poverty_rate[i]:.2f}")
+
+    def calculate_poverty_rate(self, poverty_line=50):
+        """Уровень бедности по сценариям"""
+        return (self.state["pp_balance"] < poverty_line).mean(axis=-1) * 100
+
+    def scenario_metrics(self, scenario):
+        """Метрики одного сценария в формате DPPNSimulator.metrics (например, для create_dashboard)"""
+        if self.record_balances:
+            balances = [day[scenario].tolist() for day in self.metrics["daily_pp_balances"]]
+        else:
+            balances = [self.state["pp_balance"][scenario].tolist()] if self.state else []
+
+        market_data = []
+        for stats in self.metrics["market_data"]:
+            market_data.append({
+                'price_index': float(stats['price_index'][scenario]),
+                'total_products': stats['total_products'],
+                'total_transactions': int(stats['total_transactions'][scenario]),
+                'transaction_volume': float(stats['transaction_volume'][scenario]),
+                'categories': {
+                    category: {
+                        'average_price': float(data['average_price'][scenario]),
+                        'total_demand': float(data['total_demand'][scenario]),
+                        'product_count': data['product_count']
+                    }
+                    for category, data in stats['categories'].items()
+                }
+            })
+
+        return {
+            "daily_pp_balances": balances,
+            "gini_coefficients": [float(v[scenario]) for v in self.metrics["gini_coefficients"]],
+            "inflation_rates": [float(v[scenario]) for v in self.metrics["inflation_rates"]],
+            "average_happiness": [float(v[scenario]) for v in self.metrics["average_happiness"]],
+            "education_levels": [float(v[scenario]) for v in self.metrics["education_levels"]],
+            "market_data": market_data
+        }
+
+    def agent_types(self, scenario):
+        """Типы агентов сценария в виде AgentType"""
+        return [AGENT_TYPE_LIST[code] for code in self.state["agent_type"][scenario]]
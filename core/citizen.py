@@ -7,22 +7,27 @@ class AgentType(Enum):
     STUDENT = "student"
     RETIREE = "retiree"
 
+# Число случайных чисел, выбираемых гражданином на каждый день решений
+DECISION_DRAWS = 4
+
 class Citizen:
-    def __init__(self, citizen_id, agent_type, age=25):
+    def __init__(self, citizen_id, agent_type, age=25, rng=None):
         self.id = citizen_id
+        self.rng = rng or random  # Личный поток случайных чисел (общий random по умолчанию)
         self.agent_type = agent_type
         self.age = age
         self.pp_balance = 100  # Стартовый баланс
-        self.education_level = random.randint(1, 10)
+        self.education_level = self.rng.randint(1, 10)
         self.health = 100
         self.happiness = 50
         self.products = []
         self.skills = []
         self.employment_status = "unemployed"
+        self.decision_draws = []
         
         # Характеристики based on type
-        self.risk_tolerance = random.uniform(0.1, 0.9)
-        self.learning_ability = random.uniform(0.3, 1.0)
+        self.risk_tolerance = self.rng.uniform(0.1, 0.9)
+        self.learning_ability = self.rng.uniform(0.3, 1.0)
         
     def receive_basic_income(self, amount):
         """Получение базового дохода"""
@@ -39,6 +44,12 @@ class Citizen:
         """Принятие экономических решений (расширенная версия)"""
         decisions = []
         
+        # Фиксированный набор случайных чисел на день, выбранный до проверки условий:
+        # образование, роскошь, выбор курса, выбор товара роскоши. Позиции в потоке
+        # не зависят от состояния гражданина, что нужно для общих случайных чисел
+        self.decision_draws = [self.rng.random() for _ in range(DECISION_DRAWS)]
+        education_draw, luxury_draw = self.decision_draws[:2]
+        
         # Базовые потребности (всегда приоритет)
         basic_needs_cost = 45  # Еда + базовое жилье
         if self.pp_balance > basic_needs_cost:
@@ -46,12 +57,12 @@ class Citizen:
         
         # Образовательные инвестиции (зависит от склонности к обучению)
         if (self.pp_balance > 50 and self.education_level < 8 and 
-            random.random() < self.learning_ability * 0.3):
+            education_draw < self.learning_ability * 0.3):
             decisions.append("invest_in_education")
         
         # Роскошь (только при достаточном богатстве)
         if (self.pp_balance > 150 and self.risk_tolerance > 0.5 and
-            random.random() < 0.2):  # 20% шанс
+            luxury_draw < 0.2):  # 20% шанс
             decisions.append("buy_luxury")
             
         return decisions
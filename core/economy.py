@@ -8,6 +8,7 @@ class DPPNEconomy:
         self.inflation_rate = 0.0
         self.gdp = 0
         self.gini_coefficient = 0.5
+        self.tax_rate = 0.1  # 10% налог
         
     def calculate_inflation(self, citizens):
         """Расчет инфляции на основе роста денежной массы"""
@@ -49,7 +50,7 @@ class DPPNEconomy:
         
         for citizen in citizens:
             # Сбор налогов
-            tax_paid = citizen.pay_taxes(0.1)  # 10% налог
+            tax_paid = citizen.pay_taxes(self.tax_rate)
             total_tax_revenue += tax_paid
             
             # Выплата базового дохода
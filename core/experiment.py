@@ -0,0 +1,190 @@
+import contextlib
+import math
+import os
+import statistics
+from core.simulator import DPPNSimulator
+from config.settings import SIMULATION_CONFIG
+
+
+def final_average_balance(simulator):
+    """Средний баланс PP в конце симуляции"""
+    return sum(simulator.metrics["daily_pp_balances"][-1]) / len(simulator.citizens)
+
+
+def final_gini(simulator):
+    """Коэффициент Джини в конце симуляции"""
+    return simulator.metrics["gini_coefficients"][-1]
+
+
+def final_poverty_rate(simulator):
+    """Уровень бедности в конце симуляции"""
+    return simulator.calculate_poverty_rate()
+
+
+def t_cdf_two_sided(t, df):
+    """P(|T| < t) для t-распределения с целым df (Abramowitz & Stegun 26.7.3-4)"""
+    theta = math.atan(t / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2:
+        term, series = math.cos(theta), 0.0
+        for k in range(1, (df - 1) // 2 + 1):
+            series += term
+            term *= cos2 * 2 * k / (2 * k + 1)
+        return 2 / math.pi * (theta + math.sin(theta) * series)
+    term, series = 1.0, 0.0
+    for k in range(1, df // 2 + 1):
+        series += term
+        term *= cos2 * (2 * k - 1) / (2 * k)
+    return math.sin(theta) * series
+
+
+def t_quantile(p, df):
+    """
+    Квантиль t-распределения: точные формулы для df=1 и df=2, для больших df -
+    обращение точной функции распределения бисекцией.
+
+    >>> [round(t_quantile(0.975, df), 3) for df in (1, 2, 3, 5)]
+    [12.706, 4.303, 3.182, 2.571]
+    >>> [round(t_quantile(0.995, df), 2) for df in (1, 2)]
+    [63.66, 9.92]
+    """
+    if df == math.inf:
+        return statistics.NormalDist().inv_cdf(p)
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+
+    target = 2 * p - 1
+    low, high = 0.0, 1.0
+    while t_cdf_two_sided(high, df) < target:
+        low, high = high, high * 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if t_cdf_two_sided(middle, df) < target:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+class PairedComparison:
+    """
+    Сравнение двух политик на общих случайных числах (CRN).
+    В каждой репликации оба сценария запускаются с одним seed, поэтому граждане
+    получают одинаковые начальные параметры и одинаковые случайные числа решений;
+    шум сокращается в разности, и эффект оценивается по парным разностям.
+    С antithetic=True каждая репликация дополняется антитетической парой.
+    """
+
+    def __init__(self, base_config, variant_config, metric=final_average_balance, days=None,
+                 common_random_numbers=True, antithetic=False, seed=0, confidence=0.95):
+        # Сценарии - переопределения поверх SIMULATION_CONFIG
+        self.base_config = {**SIMULATION_CONFIG, **base_config}
+        self.variant_config = {**SIMULATION_CONFIG, **variant_config}
+        self.metric = metric
+        self.days = days or self.base_config["simulation_days"]
+        self.common_random_numbers = common_random_numbers
+        self.antithetic = antithetic
+        self.seed = seed
+        self.confidence = confidence
+        self.differences = []
+        self.base_outcomes = []
+        self.variant_outcomes = []
+        self.simulation_runs = 0
+
+    def run_arm(self, config, seed, antithetic=False):
+        """Один запуск симуляции (без вывода в консоль), возвращает значение метрики"""
+        simulator = DPPNSimulator(config, seed=seed, antithetic=antithetic)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            simulator.initialize_population()
+            simulator.run_simulation(days=self.days)
+        self.simulation_runs += 1
+        return self.metric(simulator)
+
+    def run_replication(self, replication):
+        """Одна репликация: разность variant - base (усредненная с антитетической парой)"""
+        seed = f"{self.seed}-{replication}"
+        variant_seed = seed if self.common_random_numbers else f"{seed}-variant"
+
+        passes = [False, True] if self.antithetic else [False]
+        differences = []
+        for antithetic in passes:
+            base = self.run_arm(self.base_config, seed, antithetic)
+            variant = self.run_arm(self.variant_config, variant_seed, antithetic)
+            self.base_outcomes.append(base)
+            self.variant_outcomes.append(variant)
+            differences.append(variant - base)
+
+        difference = sum(differences) / len(differences)
+        self.differences.append(difference)
+        return difference
+
+    def run(self, replications=10, target_half_width=None):
+        """Запуск репликаций и расчет оценки эффекта"""
+        for replication in range(len(self.differences), len(self.differences) + replications):
+            self.run_replication(replication)
+        return self.estimate(target_half_width)
+
+    def estimate(self, target_half_width=None):
+        """
+        Оценка эффекта с доверительным интервалом и необходимым числом запусков.
+        target_half_width - желаемая полуширина интервала (по умолчанию 10% от эффекта).
+        Если все парные разности одинаковы, оценка невозможна (ValueError).
+        """
+        n = len(self.differences)
+        if n < 2:
+            raise ValueError("At least two replications are required")
+
+        effect = statistics.mean(self.differences)
+        std_dev = statistics.stdev(self.differences)
+        if std_dev == 0:
+            # Нулевой разброс - не точная оценка, а признак того, что политика не влияет на метрику
+            raise ValueError(
+                f"All {n} paired differences equal {effect}; the policies do not change this metric, "
+                "so no confidence interval or variance reduction can be estimated"
+            )
+        quantile = t_quantile((1 + self.confidence) / 2, n - 1)
+        half_width = quantile * std_dev / math.sqrt(n)
+
+        # Для сравнения: дисперсия разности при независимых запусках сценариев
+        independent_variance = statistics.variance(self.base_outcomes) + statistics.variance(self.variant_outcomes)
+        runs_per_replication = self.simulation_runs // n
+
+        target = target_half_width or abs(effect) * 0.1
+        z = statistics.NormalDist().inv_cdf((1 + self.confidence) / 2)
+        if target > 0:
+            runs_needed = math.ceil((z * std_dev / target) ** 2) * runs_per_replication
+            independent_runs_needed = math.ceil(z**2 * independent_variance / target**2) * 2
+        else:
+            runs_needed = independent_runs_needed = math.inf
+
+        return {
+            "effect": effect,
+            "std_error": std_dev / math.sqrt(n),
+            "confidence_interval": (effect - half_width, effect + half_width),
+            "confidence": self.confidence,
+            "replications": n,
+            "simulation_runs": self.simulation_runs,
+            "target_half_width": target,
+            "runs_needed": runs_needed,
+            "independent_runs_needed": independent_runs_needed,
+            # Выигрыш в точности на одинаковое число запусков относительно независимых запусков
+            "variance_reduction": 2 * independent_variance / (runs_per_replication * std_dev**2)
+        }
+
+    def print_report(self, result):
+        """Печать результатов сравнения"""
+        low, high = result["confidence_interval"]
+
+        print("\n" + "="*50)
+        print("DPPN PAIRED POLICY COMPARISON")
+        print("="*50)
+        print(f"Effect (variant - base): {result['effect']:.3f} ± {result['std_error']:.3f}")
+        print(f"{result['confidence']:.0%} CI: [{low:.3f}, {high:.3f}]")
+        print(f"Replications: {result['replications']} ({result['simulation_runs']} simulation runs)")
+        print(f"Runs needed for ±{result['target_half_width']:.3f}: {result['runs_needed']} "
+              f"(independent runs: {result['independent_runs_needed']})")
+        print(f"Variance reduction factor: {result['variance_reduction']:.1f}x")
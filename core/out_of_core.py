@@ -0,0 +1,302 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from core.vectorized import (
+    VectorMarket, initialize_arrays, receive_basic_income, redistribute_wealth,
+    process_education, human_capital, calculate_inflation, make_economic_decisions,
+    process_decisions
+)
+from config.settings import SIMULATION_CONFIG
+
+# Поля состояния граждан и их типы в файлах на диске
+FIELDS = {
+    "agent_type": np.int8,
+    "age": np.int16,
+    "pp_balance": np.float64,
+    "education_level": np.float64,
+    "health": np.float64,
+    "happiness": np.float64,
+    "risk_tolerance": np.float64,
+    "learning_ability": np.float64,
+    "course_days": np.int16,
+    "course_gain": np.float64,
+}
+
+
+class OutOfCoreSimulator:
+    """
+    Симуляция населения, не помещающегося в память.
+    Состояние граждан хранится в memory-mapped .npy файлах, фазы run_day
+    обрабатывают население блоками фиксированного размера с последовательным
+    чтением и предзагрузкой следующего блока. Пиковая память определяется
+    block_size, а не размером населения.
+    """
+
+    def __init__(self, directory, config=None, block_size=1_000_000, seed=None, gini_bins=65536):
+        self.config = config or SIMULATION_CONFIG
+        self.directory = directory
+        self.block_size = block_size
+        self.population_size = self.config["population_size"]
+        self.rng = np.random.default_rng(seed)
+        self.gini_bins = gini_bins
+        self.arrays = {}
+        self.market = VectorMarket()
+        self.circulating_pp = np.zeros(1)
+        self.tax_revenue = 0.0
+        self.poverty_rate = 0.0
+        self.average_balance = 0.0
+        self.day = 0
+        self.metrics = {
+            "daily_pp_balances": [],  # Балансы всех граждан не хранятся
+            "gini_coefficients": [],
+            "inflation_rates": [],
+            "average_happiness": [],
+            "education_levels": [],
+            "market_data": []
+        }
+
+    def _path(self, field):
+        return os.path.join(self.directory, f"{field}.npy")
+
+    def _state_path(self):
+        return os.path.join(self.directory, "simulation_state.json")
+
+    def initialize_population(self):
+        """Создание файлов состояния и поблочная инициализация населения"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.arrays = {
+            field: np.lib.format.open_memmap(self._path(field), mode="w+", dtype=dtype, shape=(self.population_size,))
+            for field, dtype in FIELDS.items()
+        }
+        for start in range(0, self.population_size, self.block_size):
+            end = min(start + self.block_size, self.population_size)
+            block = initialize_arrays(self.rng, (end - start,))
+            for field in FIELDS:
+                self.arrays[field][start:end] = block[field]
+        self._flush()
+        self._save_state()
+
+    def load_population(self):
+        """
+        Открытие ранее созданных файлов состояния и восстановление дня, денежной
+        массы, счетчиков рынка, итогов последнего дня и состояния генератора
+        случайных чисел. История metrics не восстанавливается.
+        """
+        self.arrays = {field: np.load(self._path(field), mmap_mode="r+") for field in FIELDS}
+        self.population_size = len(self.arrays["pp_balance"])
+
+        with open(self._state_path()) as f:
+            state = json.load(f)
+        self.day = state["day"]
+        self.circulating_pp = np.array([state["circulating_pp"]])
+        self.tax_revenue = state["tax_revenue"]
+        self.average_balance = state["average_balance"]
+        self.poverty_rate = state["poverty_rate"]
+        self.rng.bit_generator.state = state["rng_state"]
+        market = self.market
+        market.prices = np.array([state["prices"]])
+        market.demand = np.array([state["demand"]])
+        market.supply = np.array([state["supply"]])
+        market.price_index = np.array([state["price_index"]])
+        market.total_transactions = np.array([state["total_transactions"]], dtype=np.int64)
+        market.transaction_volume = np.array([state["transaction_volume"]])
+
+    def _save_state(self):
+        """Сохранение дневных агрегатов рядом с файлами граждан"""
+        market = self.market
+        state = {
+            "day": self.day,
+            "circulating_pp": float(self.circulating_pp[0]),
+            "tax_revenue": float(self.tax_revenue),
+            "average_balance": float(self.average_balance),
+            "poverty_rate": float(self.poverty_rate),
+            "rng_state": self.rng.bit_generator.state,
+            "prices": market.prices[0].tolist(),
+            "demand": market.demand[0].tolist(),
+            "supply": market.supply[0].tolist(),
+            "price_index": float(market.price_index[0]),
+            "total_transactions": int(market.total_transactions[0]),
+            "transaction_volume": float(market.transaction_volume[0])
+        }
+        with open(self._state_path(), "w") as f:
+            json.dump(state, f, indent=2)
+
+    def _flush(self):
+        for array in self.arrays.values():
+            array.flush()
+
+    def _blocks(self, fields, writable):
+        """Последовательный обход блоков с предзагрузкой следующего и записью измененных полей"""
+        starts = list(range(0, self.population_size, self.block_size))
+
+        def load(start):
+            end = min(start + self.block_size, self.population_size)
+            return start, end, {field: np.array(self.arrays[field][start:end]) for field in fields}
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(load, starts[0])
+            for next_start in starts[1:] + [None]:
+                start, end, block = future.result()
+                if next_start is not None:
+                    future = executor.submit(load, next_start)
+                yield block
+                for field in writable:
+                    self.arrays[field][start:end] = block[field]
+
+    def run_day(self):
+        """Запуск одного дня симуляции (два прохода по населению)"""
+        basic_income = self.config["basic_income_amount"]
+        n = self.population_size
+
+        # Проход 1: доход, налоги и образование; агрегаты для инфляции и рынка
+        total_balance = 0.0
+        total_human_capital = 0.0
+        tax_revenue = 0.0
+        max_balance = 0.0
+        for block in self._blocks(
+            ["pp_balance", "happiness", "education_level", "health", "course_days", "course_gain"],
+            ["pp_balance", "happiness", "education_level", "course_days", "course_gain"]
+        ):
+            balance, happiness = block["pp_balance"], block["happiness"]
+            receive_basic_income(balance, happiness, basic_income)
+            tax_revenue += redistribute_wealth(balance, happiness, basic_income, self.config["tax_rate"])
+            process_education(block["education_level"], happiness, block["course_days"], block["course_gain"])
+            total_balance += balance.sum()
+            total_human_capital += human_capital(block["education_level"], block["health"])
+            max_balance = max(max_balance, float(balance.max()))
+        self.tax_revenue = tax_revenue
+
+        # Обновление рыночных условий (глобально, по агрегатам прохода 1)
+        inflation_rate = self._calculate_inflation(total_balance, total_human_capital)
+        self.market.update_market_conditions(np.array([total_balance / n]), inflation_rate)
+
+        # Максимум прохода 1 - верхняя граница для гистограммы Джини: покупки балансы только уменьшают
+        max_balance = max_balance or 1.0
+
+        # Проход 2: решения граждан и агрегация метрик
+        totals = {"balance": 0.0, "human_capital": 0.0, "happiness": 0.0, "education": 0.0, "poor": 0}
+        bin_counts = np.zeros(self.gini_bins)
+        bin_sums = np.zeros(self.gini_bins)
+        for block in self._blocks(
+            ["pp_balance", "happiness", "education_level", "health", "learning_ability", "risk_tolerance"],
+            ["pp_balance", "happiness", "education_level"]
+        ):
+            balance = block["pp_balance"][None]
+            happiness = block["happiness"][None]
+            education = block["education_level"][None]
+            decisions = make_economic_decisions(
+                balance, education, block["learning_ability"][None], block["risk_tolerance"][None], self.rng
+            )
+            process_decisions(self.market, balance, happiness, education, decisions, self.rng)
+
+            balance = block["pp_balance"]
+            totals["balance"] += balance.sum()
+            totals["human_capital"] += human_capital(block["education_level"], block["health"])
+            totals["happiness"] += block["happiness"].sum()
+            totals["education"] += block["education_level"].sum()
+            totals["poor"] += int((balance < 50).sum())
+
+            bins = np.minimum((balance / max_balance * self.gini_bins).astype(np.int64), self.gini_bins - 1)
+            bin_counts += np.bincount(bins, minlength=self.gini_bins)
+            bin_sums += np.bincount(bins, weights=balance, minlength=self.gini_bins)
+        self._flush()
+
+        self.calculate_metrics(totals, bin_counts, bin_sums)
+        self.day += 1
+        self._save_state()
+
+    def _calculate_inflation(self, total_balance, total_human_capital):
+        total_balance = np.array([total_balance])
+        inflation_rate = calculate_inflation(
+            total_balance, np.array([total_human_capital]), self.population_size, self.circulating_pp
+        )
+        self.circulating_pp = total_balance
+        return inflation_rate
+
+    def calculate_gini(self, bin_counts, bin_sums):
+        """
+        Коэффициент Джини по гистограмме балансов (формула DPPNEconomy.calculate_gini).
+        Внутри корзины граждане считаются равными, погрешность - порядка ширины корзины.
+        """
+        n = bin_counts.sum()
+        total = bin_sums.sum()
+        m = bin_counts[bin_counts > 0]
+        s = bin_sums[bin_counts > 0]
+        prior_balance = np.cumsum(s) - s
+        prior_count = np.cumsum(m) - m
+        triangle = m * (m + 1) / 2
+        numerator = ((m * prior_balance + s / m * triangle) / total - (m * prior_count + triangle) / n).sum()
+        return numerator / n
+
+    def calculate_metrics(self, totals, bin_counts, bin_sums):
+        """Расчет и сохранение метрик по агрегатам прохода 2"""
+        n = self.population_size
+        self.metrics["gini_coefficients"].append(float(self.calculate_gini(bin_counts, bin_sums)))
+        self.metrics["inflation_rates"].append(
+            float(self._calculate_inflation(totals["balance"], totals["human_capital"])[0])
+        )
+        self.metrics["average_happiness"].append(totals["happiness"] / n)
+        self.metrics["education_levels"].append(totals["education"] / n)
+        self.poverty_rate = totals["poor"] / n * 100
+        self.average_balance = totals["balance"] / n
+
+        stats = self.market.get_market_statistics()
+        self.metrics["market_data"].append({
+            'price_index': float(stats['price_index'][0]),
+            'total_products': stats['total_products'],
+            'total_transactions': int(stats['total_transactions'][0]),
+            'transaction_volume': float(stats['transaction_volume'][0]),
+            'categories': {
+                category: {
+                    'average_price': float(data['average_price'][0]),
+                    'total_demand': float(data['total_demand'][0]),
+                    'product_count': data['product_count']
+                }
+                for category, data in stats['categories'].items()
+            }
+        })
+
+    def run_simulation(self, days=None):
+        """Запуск полной симуляции"""
+        days = days or self.config["simulation_days"]
+
+        print(f"Starting out-of-core DPPN simulation for {days} days...")
+        print(f"Population: {self.population_size} citizens, block size: {self.block_size}")
+
+        for day in range(days):
+            self.run_day()
+
+            if day % 30 == 0:  # Отчет каждый месяц
+                self.print_progress(day)
+
+        self.print_final_report()
+
+    def print_progress(self, day):
+        """Печать прогресса симуляции"""
+        print(f"Day {day}: Avg PP={self.average_balance:.1f}, "
+              f"Happiness={self.metrics['average_happiness'][-1]:.1f}, "
+              f"Gini={self.metrics['gini_coefficients'][-1]:.3f}, "
+              f"Price Index={self.metrics['market_data'][-1]['price_index']:.1f}")
+
+    def print_final_report(self):
+        """Финальный отчет симуляции"""
+        print("\n" + "="*50)
+        print("DPPN OUT-OF-CORE SIMULATION FINAL REPORT")
+        print("="*50)
+
+        final_metrics = {
+            "Average PP Balance": self.average_balance,
+            "Final Gini Coefficient": self.metrics["gini_coefficients"][-1],
+            "Average Happiness": self.metrics["average_happiness"][-1],
+            "Average Education Level": self.metrics["education_levels"][-1],
+            "Poverty Rate": self.poverty_rate
+        }
+
+        for metric, value in final_metrics.items():
+            print(f"{metric}: {value:.2f}")
+
+        final_market = self.metrics["market_data"][-1]
+        print(f"\nMarket Price Index: {final_market['price_index']:.1f}")
+        print(f"Total Transactions: {final_market['total_transactions']}")
+        print(f"Transaction Volume: {final_market['transaction_volume']:.1f} PP")
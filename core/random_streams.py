@@ -0,0 +1,26 @@
+import random
+
+
+class AntitheticRandom(random.Random):
+    """
+    Антитетический генератор: при том же зерне дает зеркальные значения.
+    random() возвращает 1 - u, а целочисленные выборки (randint, choice)
+    берут индекс с противоположного конца диапазона.
+    """
+
+    def random(self):
+        return 1.0 - super().random()
+
+    def _randbelow(self, n):
+        return n - 1 - self._randbelow_with_getrandbits(n)
+
+
+def citizen_stream(seed, citizen_id, antithetic=False):
+    """
+    Поток случайных чисел гражданина. Зерно хешируется один раз при создании;
+    дальше гражданин расходует одинаковое во всех сценариях число значений на
+    инициализацию и ровно DECISION_DRAWS значений на каждый день решений,
+    поэтому позиции в потоке совпадают во всех сценариях.
+    """
+    generator = AntitheticRandom if antithetic else random.Random
+    return generator(f"{seed}:{citizen_id}")
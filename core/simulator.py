@@ -1,15 +1,23 @@
 import random
 from core.citizen import Citizen, AgentType
 from core.economy import DPPNEconomy
+from core.random_streams import citizen_stream
 from models.education import EducationSystem
 from models.market import Market, ProductCategory  # ДОБАВИТЬ ИМПОРТ
 from config.settings import SIMULATION_CONFIG, AGENT_TYPES
 
 class DPPNSimulator:
-    def __init__(self, config=None):
+    def __init__(self, config=None, recorder=None, seed=None, antithetic=False):
         self.config = config or SIMULATION_CONFIG
+        self.recorder = recorder  # Запись трассы событий (core.trace.TraceRecorder)
+        
+        # Общие случайные числа: при заданном seed у каждого гражданина свой поток,
+        # одинаковый во всех сценариях с тем же seed
+        self.seed = seed
+        self.antithetic = antithetic
         self.citizens = []
         self.economy = DPPNEconomy()
+        self.economy.tax_rate = self.config.get("tax_rate", self.economy.tax_rate)
         self.education_system = EducationSystem()
         self.market = Market()
         self.day = 0
@@ -27,18 +35,22 @@ class DPPNSimulator:
         agent_types = list(AgentType)
         
         for i in range(self.config["population_size"]):
-            agent_type = random.choice(agent_types)
-            age = random.randint(18, 80)
-            citizen = Citizen(i, agent_type, age)
+            rng = citizen_stream(self.seed, i, self.antithetic) if self.seed is not None else random
+            agent_type = rng.choice(agent_types)
+            age = rng.randint(18, 80)
+            citizen = Citizen(i, agent_type, age, rng)
             
             # Начальный баланс based on type
             base_income = AGENT_TYPES[agent_type.value]["base_income"]
-            citizen.pp_balance = random.randint(int(base_income * 0.5), int(base_income * 1.5))
+            citizen.pp_balance = rng.randint(int(base_income * 0.5), int(base_income * 1.5))
             
             self.citizens.append(citizen)
             
     def run_day(self):
         """Запуск одного дня симуляции"""
+        if self.recorder:
+            self.recorder.begin_day(self)
+            
         # Базовый доход для всех
         for citizen in self.citizens:
             citizen.receive_basic_income(self.config["basic_income_amount"])
@@ -60,6 +72,8 @@ class DPPNSimulator:
         
         # Расчет метрик
         self.calculate_metrics()
+        if self.recorder:
+            self.recorder.end_day(self)
         self.day += 1
         
     def process_decisions(self, citizen, decisions):
@@ -71,7 +85,7 @@ class DPPNSimulator:
                     citizen.pp_balance, ProductCategory.EDUCATION
                 )
                 if education_products:
-                    chosen_product = random.choice(education_products[:3])  # Выбор из топ-3
+                    chosen_product = self.pick_product(education_products[:3], citizen.decision_draws[2])  # Выбор из топ-3
                     if self.market.simulate_purchase(citizen, chosen_product):
                         # Улучшение образования после покупки
                         citizen.education_level = min(10, citizen.education_level + 0.5)
@@ -96,10 +110,14 @@ class DPPNSimulator:
                     citizen.pp_balance * 0.2, ProductCategory.LUXURY  # До 20% бюджета
                 )
                 if luxury_products:
-                    chosen_product = random.choice(luxury_products[:2])
+                    chosen_product = self.pick_product(luxury_products[:2], citizen.decision_draws[3])
                     if self.market.simulate_purchase(citizen, chosen_product):
                         print(f"Citizen {citizen.id} purchased luxury: {chosen_product.name}")
         
+    def pick_product(self, products, draw):
+        """Выбор товара по заранее выбранному случайному числу из [0, 1]"""
+        return products[min(int(draw * len(products)), len(products) - 1)]
+        
     def calculate_metrics(self):
         """Расчет и сохранение метрик"""
         balances = [c.pp_balance for c in self.citizens]
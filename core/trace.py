@@ -0,0 +1,270 @@
+import numpy as np
+from core.vectorized import AGENT_TYPE_LIST, CATEGORY_LIST, HAPPINESS_CAP, EDUCATION_CAP
+from models.market import ProductCategory
+
+# Компактная трасса событий симуляции и ее воспроизведение.
+#
+# TraceRecorder подключается к DPPNSimulator (recorder=...) и по дням копит
+# дельты состояния: базовый доход, ставку налога, покупки, завершения курсов и
+# изменения цен, а также периодические ключевые кадры (полное состояние граждан).
+# Трасса сохраняется одним сжатым .npz файлом. TraceReplay прогоняет ее через
+# пользовательские редьюсеры метрик без повторной симуляции и умеет
+# перематывать на любой день от ближайшего ключевого кадра.
+#
+# Записываются только фазы run_day: изменения состояния вне run_day
+# (например, EducationSystem.enroll_student между днями) в дельты не попадают.
+
+
+class TraceRecorder:
+    """Запись трассы событий DPPNSimulator"""
+
+    def __init__(self, keyframe_interval=30):
+        self.keyframe_interval = keyframe_interval
+        self.start_day = None
+        self.index = {}  # citizen_id -> позиция в массивах
+        self.agent_types = None
+        self.products = None
+        self.product_index = {}
+
+        self.income = []
+        self.tax_rates = []
+        self.purchases = []     # по дням: (citizen, product, price)
+        self.completions = []   # по дням: (citizen, skill_gain)
+        self.price_changes = []  # по дням: (product, price)
+        self.keyframes = []     # (day, balance, happiness, education, prices)
+
+        self._transaction_start = 0
+        self._last_prices = None
+
+    def begin_day(self, simulator):
+        """Начало дня: ключевой кадр и отметка начала транзакций"""
+        if self.start_day is None:
+            self._start(simulator)
+        if (simulator.day - self.start_day) % self.keyframe_interval == 0:
+            self.keyframes.append(self._snapshot(simulator))
+        self._transaction_start = len(simulator.market.transactions)
+
+    def end_day(self, simulator):
+        """Конец дня: упаковка дельт дня в массивы"""
+        self.income.append(simulator.config["basic_income_amount"])
+        self.tax_rates.append(simulator.economy.tax_rate)
+
+        transactions = simulator.market.transactions[self._transaction_start:]
+        self.purchases.append((
+            np.array([self.index[t['citizen_id']] for t in transactions], dtype=np.int32),
+            np.array([self.product_index[t['product_id']] for t in transactions], dtype=np.uint8),
+            np.array([t['price'] for t in transactions], dtype=float)
+        ))
+
+        completed = simulator.education_system.last_completed
+        self.completions.append((
+            np.array([self.index[citizen_id] for citizen_id, _ in completed], dtype=np.int32),
+            np.array([skill_gain for _, skill_gain in completed], dtype=float)
+        ))
+
+        prices = self._prices(simulator)
+        changed = np.flatnonzero(prices != self._last_prices)
+        self.price_changes.append((changed.astype(np.uint8), prices[changed]))
+        self._last_prices = prices
+
+    def _start(self, simulator):
+        self.start_day = simulator.day
+        self.index = {c.id: i for i, c in enumerate(simulator.citizens)}
+        self.agent_types = np.array([AGENT_TYPE_LIST.index(c.agent_type) for c in simulator.citizens], dtype=np.int8)
+        self.products = simulator.market.products
+        self.product_index = {p.id: i for i, p in enumerate(self.products)}
+        self._last_prices = self._prices(simulator)
+
+    def _prices(self, simulator):
+        return np.array([p.current_price for p in simulator.market.products], dtype=float)
+
+    def _snapshot(self, simulator):
+        citizens = simulator.citizens
+        return (
+            simulator.day,
+            np.array([c.pp_balance for c in citizens], dtype=float),
+            np.array([c.happiness for c in citizens], dtype=float),
+            np.array([c.education_level for c in citizens], dtype=float),
+            self._prices(simulator)
+        )
+
+    def save(self, path):
+        """Сохранение трассы в сжатый бинарный файл (.npz)"""
+        # Ключевой кадр без завершенного дня (например, исключение внутри run_day) - тоже пустая трасса
+        if self.start_day is None or not self.income:
+            raise ValueError("Nothing recorded yet")
+
+        arrays = {
+            "start_day": np.array(self.start_day),
+            "keyframe_interval": np.array(self.keyframe_interval),
+            "citizen_ids": np.array(list(self.index), dtype=np.int64),
+            "agent_types": self.agent_types,
+            "product_ids": np.array([p.id for p in self.products], dtype=np.int32),
+            "product_categories": np.array([CATEGORY_LIST.index(p.category) for p in self.products], dtype=np.uint8),
+            "product_quality": np.array([p.quality for p in self.products], dtype=float),
+            "product_base_prices": np.array([p.base_price for p in self.products], dtype=float),
+            "income": np.array(self.income, dtype=float),
+            "tax_rates": np.array(self.tax_rates, dtype=float),
+            "keyframe_days": np.array([k[0] for k in self.keyframes], dtype=np.int32),
+        }
+        for i, name in enumerate(["balance", "happiness", "education", "prices"], start=1):
+            arrays[f"keyframe_{name}"] = np.stack([k[i] for k in self.keyframes])
+
+        # События по дням хранятся плоскими массивами со смещениями начала каждого дня
+        for name, days, fields in [
+            ("purchase", self.purchases, ["citizen", "product", "price"]),
+            ("completion", self.completions, ["citizen", "skill_gain"]),
+            ("price_change", self.price_changes, ["product", "price"]),
+        ]:
+            arrays[f"{name}_offsets"] = np.cumsum([0] + [len(day[0]) for day in days]).astype(np.int64)
+            for i, field in enumerate(fields):
+                arrays[f"{name}_{field}"] = np.concatenate([day[i] for day in days])
+
+        np.savez_compressed(path, **arrays)
+
+
+class ReplayState:
+    """Состояние граждан и рынка во время воспроизведения трассы"""
+
+    def __init__(self, trace):
+        self.day = None
+        self.agent_types = trace["agent_types"]
+        self.product_categories = trace["product_categories"]
+        self.balance = None
+        self.happiness = None
+        self.education = None
+        self.prices = None
+
+    @property
+    def population(self):
+        return len(self.balance)
+
+    def agent_type_mask(self, agent_type):
+        """Маска граждан данного AgentType"""
+        return self.agent_types == AGENT_TYPE_LIST.index(agent_type)
+
+
+class TraceReplay:
+    """Воспроизведение трассы через пользовательские редьюсеры метрик"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.trace = {key: data[key] for key in data.files}
+
+        self.start_day = int(self.trace["start_day"])
+        self.days = len(self.trace["income"])
+        self.end_day = self.start_day + self.days
+        self.keyframe_days = self.trace["keyframe_days"]
+
+        is_education = self.trace["product_categories"] == CATEGORY_LIST.index(ProductCategory.EDUCATION)
+        self.happiness_gain = self.trace["product_quality"] * 5
+        self.education_gain = np.where(is_education, 0.5, 0.0)
+        self.state = ReplayState(self.trace)
+        self.seek(self.start_day)
+
+    def seek(self, day):
+        """Перемотка к началу дня day от ближайшего предшествующего ключевого кадра"""
+        if not self.start_day <= day <= self.end_day:
+            raise ValueError(f"Day {day} is outside the trace [{self.start_day}, {self.end_day}]")
+
+        k = np.searchsorted(self.keyframe_days, day, side="right") - 1
+        state = self.state
+        state.day = int(self.keyframe_days[k])
+        state.balance = self.trace["keyframe_balance"][k].copy()
+        state.happiness = self.trace["keyframe_happiness"][k].copy()
+        state.education = self.trace["keyframe_education"][k].copy()
+        state.prices = self.trace["keyframe_prices"][k].copy()
+
+        while state.day < day:
+            self.step()
+        return state
+
+    def events(self, day):
+        """События дня day в виде словаря массивов"""
+        i = day - self.start_day
+        result = {"income": self.trace["income"][i], "tax_rate": self.trace["tax_rates"][i]}
+        for name, fields in [
+            ("purchase", ["citizen", "product", "price"]),
+            ("completion", ["citizen", "skill_gain"]),
+            ("price_change", ["product", "price"]),
+        ]:
+            start, end = self.trace[f"{name}_offsets"][i:i + 2]
+            result[name + "s"] = {field: self.trace[f"{name}_{field}"][start:end] for field in fields}
+        return result
+
+    def step(self):
+        """Применение событий текущего дня; возвращает эти события"""
+        state = self.state
+        if state.day >= self.end_day:
+            raise ValueError("Trace is exhausted")
+        events = self.events(state.day)
+
+        # Базовый доход, затем налог и повторный базовый доход (порядок run_day)
+        state.balance += events["income"]
+        np.minimum(state.happiness + 5, HAPPINESS_CAP, out=state.happiness)
+        state.balance -= state.balance * events["tax_rate"]
+        state.balance += events["income"]
+        np.minimum(state.happiness + 5, HAPPINESS_CAP, out=state.happiness)
+
+        # Завершения курсов
+        completions = events["completions"]
+        citizen = completions["citizen"]
+        state.education[citizen] = np.minimum(EDUCATION_CAP, state.education[citizen] + completions["skill_gain"])
+        state.happiness[citizen] = np.minimum(HAPPINESS_CAP, state.happiness[citizen] + 10)
+
+        # Изменения цен
+        changes = events["price_changes"]
+        state.prices[changes["product"]] = changes["price"]
+
+        # Покупки: прибавки положительны, поэтому ограничение сверху можно применить один раз
+        purchases = events["purchases"]
+        citizen, product = purchases["citizen"], purchases["product"]
+        np.subtract.at(state.balance, citizen, purchases["price"])
+        np.add.at(state.happiness, citizen, self.happiness_gain[product])
+        np.minimum(state.happiness, HAPPINESS_CAP, out=state.happiness)
+        np.add.at(state.education, citizen, self.education_gain[product])
+        np.minimum(state.education, EDUCATION_CAP, out=state.education)
+
+        state.day += 1
+        return events
+
+    def run(self, reducers, start=None, end=None):
+        """
+        Прогон дней [start, end) через редьюсеры {имя: функция(state, events)}.
+        Каждая функция вызывается после применения дня; возвращает {имя: [значения]}.
+        """
+        start = self.start_day if start is None else start
+        end = self.end_day if end is None else end
+        self.seek(start)
+
+        results = {name: [] for name in reducers}
+        while self.state.day < end:
+            events = self.step()
+            for name, reducer in reducers.items():
+                results[name].append(reducer(self.state, events))
+        return results
+
+
+def poverty_rate_by_agent_type(poverty_line=50):
+    """Редьюсер: уровень бедности (%) по типам агентов"""
+    def reducer(state, events):
+        poor = state.balance < poverty_line
+        return {
+            agent_type.value: float(poor[state.agent_type_mask(agent_type)].mean() * 100)
+            for agent_type in AGENT_TYPE_LIST
+            if state.agent_type_mask(agent_type).any()
+        }
+    return reducer
+
+
+def spend_share_by_category(state, events):
+    """Редьюсер: доля расходов дня по категориям товаров"""
+    purchases = events["purchases"]
+    spent = np.bincount(
+        state.product_categories[purchases["product"]], weights=purchases["price"], minlength=len(CATEGORY_LIST)
+    )
+    total = spent.sum()
+    return {
+        category.value: float(spent[i] / total) if total > 0 else 0.0
+        for i, category in enumerate(CATEGORY_LIST)
+    }
@@ -0,0 +1,211 @@
+import numpy as np
+from core.citizen import AgentType
+from models.market import Market, ProductCategory
+from config.settings import AGENT_TYPES
+
+# Векторные версии правил из Citizen, DPPNEconomy, EducationSystem и Market.
+# Все функции работают с массивами формы [..., граждане], где ведущие оси -
+# сценарии (пакетный режим) или блоки (out-of-core режим).
+
+AGENT_TYPE_LIST = list(AgentType)
+CATEGORY_LIST = list(ProductCategory)
+BASE_INCOMES = np.array([AGENT_TYPES[t.value]["base_income"] for t in AGENT_TYPE_LIST], dtype=float)
+
+BASIC_NEEDS_COST = 45
+HAPPINESS_CAP = 100
+EDUCATION_CAP = 10
+
+
+def initialize_arrays(rng, shape):
+    """Случайная инициализация состояния граждан (аналог initialize_population)"""
+    agent_type = rng.integers(0, len(AGENT_TYPE_LIST), shape).astype(np.int8)
+    base_income = BASE_INCOMES[agent_type]
+    low = (base_income * 0.5).astype(int)
+    high = (base_income * 1.5).astype(int)
+    return {
+        "agent_type": agent_type,
+        "age": rng.integers(18, 81, shape).astype(np.int16),
+        "pp_balance": rng.integers(low, high + 1).astype(float),
+        "education_level": rng.integers(1, 11, shape).astype(float),
+        "health": np.full(shape, 100.0),
+        "happiness": np.full(shape, 50.0),
+        "risk_tolerance": rng.uniform(0.1, 0.9, shape),
+        "learning_ability": rng.uniform(0.3, 1.0, shape),
+        "course_days": np.zeros(shape, dtype=np.int16),
+        "course_gain": np.zeros(shape),
+    }
+
+
+def receive_basic_income(balance, happiness, amount):
+    """Получение базового дохода (Citizen.receive_basic_income)"""
+    balance += amount
+    np.minimum(happiness + 5, HAPPINESS_CAP, out=happiness)
+
+
+def redistribute_wealth(balance, happiness, basic_income_amount, tax_rate):
+    """Налоги и базовый доход (DPPNEconomy.redistribute_wealth), возвращает налоги по сценариям"""
+    tax = balance * tax_rate
+    balance -= tax
+    receive_basic_income(balance, happiness, basic_income_amount)
+    return tax.sum(axis=-1)
+
+
+def process_education(education, happiness, course_days, course_gain):
+    """Продвижение курсов (EducationSystem.process_education), возвращает маску завершивших"""
+    enrolled = course_days > 0
+    course_days[enrolled] -= 1
+    completed = enrolled & (course_days == 0)
+    education[completed] = np.minimum(EDUCATION_CAP, education[completed] + course_gain[completed])
+    happiness[completed] = np.minimum(HAPPINESS_CAP, happiness[completed] + 10)
+    course_gain[completed] = 0
+    return completed
+
+
+def human_capital(education, health):
+    """Сумма человеческого капитала по последней оси"""
+    return (education * health / 100).sum(axis=-1)
+
+
+def calculate_inflation(total_balance, total_human_capital, population, circulating_pp):
+    """Инфляция = рост денежной массы - рост экономики (DPPNEconomy.calculate_inflation)"""
+    money_supply_growth = np.divide(
+        total_balance - circulating_pp, circulating_pp,
+        out=np.zeros_like(total_balance, dtype=float), where=circulating_pp > 0
+    )
+    economic_growth = total_human_capital / population * 0.01
+    return np.maximum(0, money_supply_growth - economic_growth)
+
+
+def calculate_gini(balances):
+    """Коэффициент Джини по последней оси (та же формула, что в DPPNEconomy.calculate_gini)"""
+    n = balances.shape[-1]
+    cumulative = np.cumsum(np.sort(balances, axis=-1), axis=-1)
+    population_share = np.arange(1, n + 1) / n
+    return (cumulative / cumulative[..., -1:] - population_share).sum(axis=-1) / n
+
+
+def make_economic_decisions(balance, education, learning_ability, risk_tolerance, rng):
+    """Решения граждан (Citizen.make_economic_decision) в виде трех масок"""
+    draws = rng.random((2,) + balance.shape)
+    buy_products = balance > BASIC_NEEDS_COST
+    invest_in_education = (balance > 50) & (education < 8) & (draws[0] < learning_ability * 0.3)
+    buy_luxury = (balance > 150) & (risk_tolerance > 0.5) & (draws[1] < 0.2)
+    return buy_products, invest_in_education, buy_luxury
+
+
+class VectorMarket:
+    """Рынок с ценами и спросом в виде массивов [сценарии x товары]"""
+
+    def __init__(self, scenarios=1, market=None):
+        market = market or Market()
+        products = market.products
+        self.products = products
+        self.product_ids = np.array([p.id for p in products])
+        self.categories = np.array([CATEGORY_LIST.index(p.category) for p in products])
+        self.base_prices = np.array([p.base_price for p in products])
+        self.quality = np.array([p.quality for p in products])
+        self.base_demand = np.array([market.get_base_demand_for_category(p.category) for p in products])
+        self.is_luxury = self.categories == CATEGORY_LIST.index(ProductCategory.LUXURY)
+
+        # Индексы товаров каждой категории, отсортированные по качеству (как find_affordable_products)
+        self.category_index = {}
+        for category in ProductCategory:
+            idx = [i for i, p in enumerate(products) if p.category == category]
+            idx.sort(key=lambda i: products[i].quality, reverse=True)
+            self.category_index[category] = np.array(idx, dtype=int)
+
+        shape = (scenarios, len(products))
+        self.prices = np.broadcast_to(self.base_prices, shape).copy()
+        self.demand = np.ones(shape)
+        self.supply = np.ones(shape)
+        self.price_index = np.full(scenarios, 100.0)
+        self.total_transactions = np.zeros(scenarios, dtype=np.int64)
+        self.transaction_volume = np.zeros(scenarios)
+
+    def update_market_conditions(self, avg_wealth, inflation_rate):
+        """Обновление спроса, предложения и цен (Market.update_market_conditions)"""
+        wealth_factor = (np.asarray(avg_wealth, dtype=float) / 100)[:, None]
+        demand_multiplier = np.where(
+            self.is_luxury, np.maximum(0, wealth_factor - 1), np.minimum(1, wealth_factor)
+        )
+        self.demand = self.base_demand * (1 + demand_multiplier)
+        self.supply = np.broadcast_to(1.0 + wealth_factor * 0.5, self.demand.shape).copy()
+
+        ratio = self.demand / np.maximum(self.supply, 0.1)
+        inflation = np.asarray(inflation_rate, dtype=float)[:, None]
+        self.prices = np.maximum(self.base_prices * 0.5, self.base_prices * ratio * (1 + inflation))
+        self.price_index = self.prices.mean(axis=-1) / self.base_prices.mean() * 100
+        return self.prices
+
+    def purchase(self, balance, happiness, budget, category, mask, draws=None, top_n=1):
+        """
+        Покупка в категории: лучший доступный товар или случайный из top_n лучших.
+        balance/happiness/budget/mask имеют форму [сценарии, граждане]; возвращает
+        маску купивших и индексы купленных товаров (-1 - покупки не было).
+        """
+        idx = self.category_index[category]
+        prices = self.prices[:, idx]
+        affordable = (prices[:, None, :] <= budget[..., None]) & mask[..., None]
+        count = affordable.sum(axis=-1)
+        bought = count > 0
+
+        if draws is None:
+            rank = np.zeros_like(count)
+        else:
+            rank = (draws * np.minimum(count, top_n)).astype(count.dtype)
+        position = ((np.cumsum(affordable, axis=-1) == (rank + 1)[..., None]) & affordable).argmax(axis=-1)
+        price = np.take_along_axis(prices, position, axis=1)
+
+        product = np.where(bought, idx[position], -1)
+        balance -= np.where(bought, price, 0)
+        np.minimum(happiness + np.where(bought, self.quality[idx][position] * 5, 0), HAPPINESS_CAP, out=happiness)
+
+        self.total_transactions += bought.sum(axis=-1)
+        self.transaction_volume += np.where(bought, price, 0).sum(axis=-1)
+        scenarios, n_products = self.demand.shape
+        scenario_idx = np.broadcast_to(np.arange(scenarios)[:, None], bought.shape)
+        flat = scenario_idx[bought] * n_products + product[bought]
+        self.demand += 0.1 * np.bincount(flat, minlength=scenarios * n_products).reshape(self.demand.shape)
+        return bought, product
+
+    def get_market_statistics(self):
+        """Статистика рынка по сценариям (значения - массивы длины числа сценариев)"""
+        category_stats = {}
+        for category in ProductCategory:
+            idx = self.category_index[category]
+            if len(idx):
+                category_stats[category.value] = {
+                    'average_price': self.prices[:, idx].mean(axis=-1),
+                    'total_demand': self.demand[:, idx].sum(axis=-1),
+                    'product_count': len(idx)
+                }
+        return {
+            'price_index': self.price_index.copy(),
+            'total_products': len(self.products),
+            'total_transactions': self.total_transactions.copy(),
+            'transaction_volume': self.transaction_volume.copy(),
+            'categories': category_stats
+        }
+
+
+def process_decisions(market, balance, happiness, education, decisions, rng):
+    """Обработка решений (DPPNSimulator.process_decisions) в порядке: база, образование, роскошь"""
+    buy_products, invest_in_education, buy_luxury = decisions
+    draws = rng.random((2,) + balance.shape)
+
+    # Базовые нужды: сначала еда, жилье - только если еда недоступна
+    bought_food, _ = market.purchase(balance, happiness, balance * 0.3, ProductCategory.FOOD, buy_products)
+    market.purchase(balance, happiness, balance * 0.3, ProductCategory.HOUSING, buy_products & ~bought_food)
+
+    # Образование: случайный выбор из топ-3
+    bought_education, _ = market.purchase(
+        balance, happiness, balance, ProductCategory.EDUCATION,
+        invest_in_education & (balance > 20), draws[0], top_n=3
+    )
+    education[bought_education] = np.minimum(EDUCATION_CAP, education[bought_education] + 0.5)
+
+    # Роскошь: до 20% бюджета, случайный выбор из топ-2
+    market.purchase(
+        balance, happiness, balance * 0.2, ProductCategory.LUXURY,
+        buy_luxury & (balance > 100), draws[1], top_n=2
+    )
@@ -6,6 +6,7 @@ class EducationSystem:
             "professional": {"cost": 100, "skill_gain": 3.0}
         }
         self.enrolled_students = {}
+        self.last_completed = []  # (citizen_id, skill_gain) за последний день
         
     def enroll_student(self, citizen, course_type):
         """Запись гражданина на курс"""
@@ -24,6 +25,7 @@ class EducationSystem:
     def process_education(self, citizens):
         """Обработка образовательного процесса"""
         completed_courses = []
+        self.last_completed = []
         
         for citizen_id, enrollment in list(self.enrolled_students.items()):
             enrollment["days_remaining"] -= 1
@@ -37,6 +39,7 @@ class EducationSystem:
                     citizen.education_level = min(10, citizen.education_level + skill_gain)
                     citizen.happiness = min(100, citizen.happiness + 10)
                     completed_courses.append(citizen_id)
+                    self.last_completed.append((citizen_id, skill_gain))
                     
         # Удаляем завершенные курсы
         for citizen_id in completed_courses: